@@ -2,15 +2,16 @@
 PlacementPro – Integrated Campus Career Suite
 Flask + MongoDB (PyMongo) + Bootstrap 5
 """
-from flask import (Flask, render_template, request, redirect, url_for,
-                   session, flash, jsonify, make_response)
+from flask import (Flask, render_template, stream_template, request, redirect, url_for,
+                   session, flash, get_flashed_messages, jsonify, send_file)
 from flask_mail import Mail, Message
 from werkzeug.security import generate_password_hash, check_password_hash
-from functools import wraps
+from functools import wraps, lru_cache
 from datetime import datetime
-import io, os
+import hashlib, io, os, time
 from bson import ObjectId
 from pymongo import MongoClient, DESCENDING
+from pymongo.errors import DuplicateKeyError
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -32,39 +33,111 @@ db = _mongo.get_default_database()
 
 # ── Helpers ──────────────────────────────────────────────────
 def oid(s):
+    if isinstance(s, ObjectId):
+        return s
+    if not isinstance(s, str) or len(s) != 24:
+        return None
     try:
-        return ObjectId(str(s))
+        return ObjectId(s)
     except Exception:
         return None
 
 def sid(doc):
     return str(doc['_id']) if doc else None
 
+_DATE_FMT = '%Y-%m-%d'
+_DT_FMT   = '%Y-%m-%dT%H:%M'
+
+# datetimes are immutable, so repeated form values can share one parse
+@lru_cache(maxsize=4096)
 def parse_date(s):
     try:
-        return datetime.strptime(s, '%Y-%m-%d') if s else None
+        return datetime.strptime(s, _DATE_FMT) if s else None
     except Exception:
         return None
 
+@lru_cache(maxsize=4096)
 def parse_dt(s):
     try:
-        return datetime.strptime(s, '%Y-%m-%dT%H:%M') if s else None
+        return datetime.strptime(s, _DT_FMT) if s else None
     except Exception:
         return None
 
+_BRANCHES = ('CSE', 'IT', 'ECE', 'EEE', 'ME', 'CE', 'MCA', 'MBA', 'Other')
+
 def branches_list():
-    return ['CSE', 'IT', 'ECE', 'EEE', 'ME', 'CE', 'MCA', 'MBA', 'Other']
+    return _BRANCHES
+
+def hash_password(password):
+    return generate_password_hash(password, method=app.config['PASSWORD_HASH_METHOD'])
+
+# full method prefix of current hashes, e.g. 'scrypt:32768:8:1'
+_HASH_PREFIX = hash_password('').split('$', 1)[0] + '$'
+
+def render_stream(template, **context):
+    """Stream a template so long lists flush as their cursor is consumed."""
+    # pop flashes now: the session cookie is sent before the body is rendered
+    get_flashed_messages()
+    return app.response_class(stream_template(template, **context))
+
+_STUDENT_SUMMARY = ('branch', 'cgpa', 'backlogs', 'profile_complete')
+
+def _build_id():
+    """Newest mtime across app.py and the templates; changes on every deploy."""
+    tpl   = os.path.join(app.root_path, app.template_folder)
+    paths = [__file__] + [os.path.join(d, f) for d, _, files in os.walk(tpl) for f in files]
+    return str(max(os.path.getmtime(p) for p in paths))
+
+_BUILD_ID = os.getenv('BUILD_ID') or _build_id()
+
+def collection_etag(coll, **accumulators):
+    """ETag for a list page: collection size, newest _id, the viewer and the build."""
+    meta = next(coll.aggregate([{'$group': {'_id': None, 'n': {'$sum': 1},
+                                            'last': {'$max': '$_id'}, **accumulators}}]),
+                {'n': 0})
+    raw  = repr((sorted(meta.items()), session.get('user_id'), session.get('user_name'), _BUILD_ID))
+    return hashlib.sha1(raw.encode()).hexdigest(), meta
+
+def revalidate(response, etag):
+    response.set_etag(etag)
+    response.cache_control.private  = True
+    response.cache_control.no_cache = True
+    return response
+
+def not_modified(etag):
+    """A 304 if the client already has this page; None if it must be rendered."""
+    # pending flashes have to be rendered, so never short-circuit those
+    if request.method == 'GET' and '_flashes' not in session and etag in request.if_none_match:
+        return revalidate(app.response_class(status=304), etag)
+    return None
 
 def get_student():
-    return db.students.find_one({'user_id': session.get('user_id')})
+    return db.students.find_one({'user_id': oid(session.get('user_id'))})
+
+def get_student_summary():
+    """Id and eligibility fields of the current student, cached in the session."""
+    summary = session.get('student')
+    if summary is None:
+        s = db.students.find_one({'user_id': oid(session.get('user_id'))},
+                                 {f: 1 for f in _STUDENT_SUMMARY})
+        if not s:
+            return None
+        summary = session['student'] = {'_id': str(s['_id']),
+                                        **{f: s[f] for f in _STUDENT_SUMMARY if f in s}}
+    return summary
 
 def get_alumni_profile():
-    return db.alumni.find_one({'user_id': session.get('user_id')})
+    if 'alumni_id' not in session:
+        al = db.alumni.find_one({'user_id': oid(session.get('user_id'))}, {'_id':1})
+        if not al:
+            return None
+        session['alumni_id'] = str(al['_id'])
+    return {'_id': ObjectId(session['alumni_id'])}
 
 def fmt_drive(d, applicant_count=None):
     """Convert MongoDB drive doc to template-friendly dict."""
     return {
-        'id':               sid(d),
+        'id':               str(d['_id']),
         'company_name':     d.get('company_name', ''),
         'job_role':         d.get('job_role', ''),
         'package_lpa':      d.get('package_lpa'),
@@ -78,9 +151,81 @@ def fmt_drive(d, applicant_count=None):
         'applicants':       applicant_count or 0,
     }
 
+_cache = {}
+
+def cached(key, loader, ttl=300):
+    """Return loader() memoised in-process for ttl seconds under key."""
+    hit = _cache.get(key)
+    now = time.monotonic()
+    if hit and now - hit[0] < ttl:
+        return hit[1]
+    value = loader()
+    _cache[key] = (now, value)
+    return value
+
+def invalidate(key):
+    _cache.pop(key, None)
+
+_pages     = {}
+_PAGES_MAX = 1024
+
+def cached_page(ttl=30):
+    """Cache a GET view's rendered HTML per viewer and URL for ttl seconds."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            # pages carrying flash messages are one-off renders
+            if request.method != 'GET' or '_flashes' in session:
+                return f(*args, **kwargs)
+            key = (session.get('user_id'), session.get('user_name'), request.full_path)
+            hit = _pages.get(key)
+            now = time.monotonic()
+            if hit and now - hit[0] < ttl:
+                return hit[1]
+            html = f(*args, **kwargs)
+            if len(_pages) >= _PAGES_MAX:
+                # snapshot first: other threads may add or clear pages meanwhile
+                for k, (ts, _) in list(_pages.items()):
+                    if now - ts >= ttl:
+                        _pages.pop(k, None)
+            if len(_pages) < _PAGES_MAX:
+                _pages[key] = (now, html)
+            return html
+        return decorated
+    return decorator
+
+def invalidate_pages():
+    _pages.clear()
+
+def applicant_counts(drive_ids=None):
+    """Map drive_id -> number of applications, in a single $group."""
+    pipeline = [{'$group': {'_id': '$drive_id', 'cnt': {'$sum': 1}}}]
+    if drive_ids is not None:
+        pipeline.insert(0, {'$match': {'drive_id': {'$in': list(drive_ids)}}})
+    return {r['_id']: r['cnt'] for r in db.applications.aggregate(pipeline)}
+
+def referrals_with_poster(limit=None):
+    """Referrals newest first, with the posting alumnus' name joined in."""
+    pipeline = [{'$sort': {'posted_at': -1}}]
+    if limit:
+        pipeline.append({'$limit': limit})
+    pipeline += [
+        {'$lookup': {'from': 'alumni', 'localField': 'alumni_id',
+                     'foreignField': '_id', 'as': 'al'}},
+        {'$unwind': {'path': '$al', 'preserveNullAndEmptyArrays': True}},
+        {'$lookup': {'from': 'users', 'localField': 'al.user_id',
+                     'foreignField': '_id', 'as': 'u'}},
+        {'$unwind': {'path': '$u', 'preserveNullAndEmptyArrays': True}},
+        {'$project': {'company': 1, 'job_role': 1, 'description': 1, 'apply_link': 1,
+                      'deadline': 1, 'posted_at': 1, 'alumni_id': 1,
+                      'posted_by': '$u.name'}},
+    ]
+    return db.referrals.aggregate(pipeline)
+
 # ── Seed default data ─────────────────────────────────────────
 def seed_db():
-    if db.faqs.count_documents({}) == 0:
+    # estimated_document_count reads collection metadata instead of scanning
+    if db.faqs.estimated_document_count() == 0:
         db.faqs.insert_many([
             {'question': 'What is the minimum CGPA required?',
              'answer': 'The minimum CGPA varies by company. Most companies require at least 6.0 CGPA. Check each drive for exact requirements.',
@@ -108,7 +253,7 @@ def seed_db():
              'keywords': 'document,certificate,marksheet,needed', 'created_at': datetime.utcnow()},
         ])
 
-    if db.market_skills.count_documents({}) == 0:
+    if db.market_skills.estimated_document_count() == 0:
         db.market_skills.insert_many([
             {'job_role': 'Data Analyst',
              'required_skills': ['Python','SQL','Excel','PowerBI','Tableau','Statistics','Data Visualization','Pandas','NumPy'],
@@ -136,7 +281,55 @@ def seed_db():
              'insight': 'Flutter and React Native cross-platform skills are trending upward in 2024.'},
         ])
 
+    # foreign keys used to be stored as strings; convert any legacy docs in place.
+    # only hex ids are touched, and $convert leaves anything odd as it was
+    for coll, field in ((db.students, 'user_id'), (db.alumni, 'user_id'),
+                        (db.applications, 'drive_id'), (db.interviews, 'drive_id'),
+                        (db.referrals, 'alumni_id'), (db.mentorship_slots, 'alumni_id')):
+        coll.update_many({field: {'$regex': '^[0-9a-fA-F]{24}$'}},
+                         [{'$set': {field: {'$convert': {'input': '$' + field, 'to': 'objectId',
+                                                         'onError': '$' + field}}}}])
+
+    # the old check-then-insert in student_apply could double-submit; keep the oldest
+    dupes = [
+        {'$group': {'_id': {'s': '$student_id', 'd': '$drive_id'},
+                    'ids': {'$push': '$_id'}, 'n': {'$sum': 1}}},
+        {'$match': {'n': {'$gt': 1}}},
+    ]
+    for g in db.applications.aggregate(dupes, allowDiskUse=True):
+        db.applications.delete_many({'_id': {'$in': sorted(g['ids'])[1:]}})
+
+def unique_index(coll, keys):
+    # legacy duplicates must not stop the app from booting; log them for cleanup instead
+    try:
+        coll.create_index(keys, unique=True)
+    except DuplicateKeyError as e:
+        app.logger.warning('unique index %s on %s not built: %s', keys, coll.name, e)
+
+def ensure_indexes():
+    # create_index is idempotent, so this is safe to run on every boot
+    unique_index(db.users, 'email')
+    db.users.create_index('role')
+    db.students.create_index('user_id')
+    db.students.create_index([('branch', 1), ('cgpa', 1), ('backlogs', 1)])
+    db.applications.create_index([('drive_id', 1), ('status', 1)])
+    unique_index(db.applications, [('student_id', 1), ('drive_id', 1)])
+    db.applications.create_index([('student_id', 1), ('applied_at', -1)])
+    db.applications.create_index('status')
+    db.applications.create_index([('applied_at', -1)])
+    unique_index(db.interviews, [('student_id', 1), ('time_slot', 1)])
+    db.interviews.create_index([('student_id', 1), ('drive_id', 1)])
+    db.drives.create_index([('created_at', -1)])
+    db.drives.create_index([('drive_date', 1)])
+    db.drives.create_index([('allowed_branches', 1), ('drive_date', 1)])
+    db.drives.create_index('status')
+    db.mentorship_slots.create_index([('booked_by', 1), ('available_time', 1)])
+    db.mentorship_slots.create_index([('alumni_id', 1), ('available_time', 1)])
+    db.referrals.create_index([('posted_at', -1)])
+    db.market_skills.create_index([('job_role', 1)])
+
 seed_db()
+ensure_indexes()
 
 # ── Auth Decorators ───────────────────────────────────────────
 def login_required(f):
@@ -188,8 +381,14 @@ def login():
     if request.method == 'POST':
         email    = request.form.get('email', '').strip().lower()
         password = request.form.get('password', '')
-        user = db.users.find_one({'email': email})
+        user = db.users.find_one({'email': email},
+                                 {'_id':1,'name':1,'email':1,'role':1,'password_hash':1})
         if user and check_password_hash(user['password_hash'], password):
+            # upgrade hashes made with an older method on the next good login
+            if not user['password_hash'].startswith(_HASH_PREFIX):
+                db.users.update_one({'_id': user['_id']},
+                                    {'$set': {'password_hash': hash_password(password)}})
+            session.clear()  # drop any profile cached for a previous user
             session['user_id']   = sid(user)
             session['user_name'] = user['name']
             session['email']     = user['email']
@@ -217,18 +416,20 @@ def register():
             flash('Password must be at least 6 characters.', 'danger')
         elif role not in ('admin', 'student', 'alumni'):
             flash('Invalid role.', 'danger')
-        elif db.users.find_one({'email': email}):
-            flash('Email already registered.', 'danger')
         else:
-            uid = db.users.insert_one({
-                'name': name, 'email': email,
-                'password_hash': generate_password_hash(password),
-                'role': role, 'created_at': datetime.utcnow()
-            }).inserted_id
+            try:
+                uid = db.users.insert_one({
+                    'name': name, 'email': email,
+                    'password_hash': hash_password(password),
+                    'role': role, 'created_at': datetime.utcnow()
+                }).inserted_id
+            except DuplicateKeyError:
+                flash('Email already registered.', 'danger')
+                return render_template('auth/register.html')
             if role == 'student':
-                db.students.insert_one({'user_id': str(uid), 'profile_complete': False})
+                db.students.insert_one({'user_id': uid, 'profile_complete': False})
             elif role == 'alumni':
-                db.alumni.insert_one({'user_id': str(uid)})
+                db.alumni.insert_one({'user_id': uid})
             flash('Registration successful! Please log in.', 'success')
             return redirect(url_for('login'))
     return render_template('auth/register.html')
@@ -244,16 +445,18 @@ def logout():
 @role_required('admin')
 def admin_dashboard():
     total_students    = db.users.count_documents({'role': 'student'})
-    total_drives      = db.drives.count_documents({})
+    total_drives      = db.drives.estimated_document_count()
     placed            = db.applications.count_documents({'status': 'selected'})
-    total_applications= db.applications.count_documents({})
+    total_applications= db.applications.estimated_document_count()
 
-    recent_raw = list(db.drives.find().sort('created_at', DESCENDING).limit(5))
+    recent_raw = list(db.drives.find({}, {'company_name':1,'job_role':1,'drive_date':1,'status':1})
+                      .sort('created_at', DESCENDING).limit(5))
+    counts = applicant_counts(d['_id'] for d in recent_raw)
     recent_drives = []
     for d in recent_raw:
-        cnt = db.applications.count_documents({'drive_id': sid(d)})
+        cnt = counts.get(d['_id'], 0)
         recent_drives.append({
-            'id': sid(d), 'company_name': d.get('company_name'),
+            'id': str(d['_id']), 'company_name': d.get('company_name'),
             'job_role': d.get('job_role'), 'drive_date': d.get('drive_date'),
             'status': d.get('status', 'upcoming'), 'applicants': cnt
         })
@@ -296,9 +499,10 @@ def admin_drives():
                                  {'$set': {'status': request.form.get('status')}})
             flash('Status updated.', 'success')
 
+    counts = applicant_counts()
     drives = []
     for d in db.drives.find().sort('created_at', DESCENDING):
-        cnt = db.applications.count_documents({'drive_id': sid(d)})
+        cnt = counts.get(d['_id'], 0)
         drives.append({**fmt_drive(d), 'applicants': cnt})
     return render_template('admin/drives.html', drives=drives, branches=branches_list())
 
@@ -306,7 +510,7 @@ def admin_drives():
 @role_required('admin')
 def admin_criteria():
     drives_raw   = list(db.drives.find({}, {'company_name':1,'job_role':1}).sort('created_at', DESCENDING))
-    drives       = [{'id': sid(d), 'company_name': d['company_name'], 'job_role': d['job_role']} for d in drives_raw]
+    drives       = [{'id': str(d['_id']), 'company_name': d['company_name'], 'job_role': d['job_role']} for d in drives_raw]
     eligible     = []
     selected_drive = None
     total_eligible = 0
@@ -315,41 +519,51 @@ def admin_criteria():
     if request.method == 'POST':
         action   = request.form.get('action', 'filter')
         drive_id = request.form.get('drive_id')
-        drive_doc= db.drives.find_one({'_id': oid(drive_id)}) if drive_id else None
+        drive_doc= db.drives.find_one({'_id': oid(drive_id)},
+                                      {'company_name':1,'job_role':1,'min_cgpa':1,
+                                       'allowed_branches':1,'max_backlogs':1}) if drive_id else None
         if drive_doc:
             selected_drive = fmt_drive(drive_doc)
             allowed = drive_doc.get('allowed_branches', [])
-            min_cgpa = float(drive_doc.get('min_cgpa') or 0)
-            max_bl   = int(drive_doc.get('max_backlogs') or 0)
-
-            matched_students = list(db.students.find({
-                'branch': {'$in': allowed},
-                'cgpa':   {'$gte': min_cgpa},
-                'backlogs': {'$lte': max_bl}
-            }))
-
-            for s in matched_students:
-                u = db.users.find_one({'_id': oid(s['user_id'])})
-                if u:
-                    eligible.append({
-                        'name': u['name'], 'email': u['email'],
-                        'roll_number': s.get('roll_number',''), 'branch': s.get('branch',''),
-                        'cgpa': s.get('cgpa',0), 'backlogs': s.get('backlogs',0),
-                        'skills': s.get('skills','')
-                    })
+            min_cgpa = drive_doc.get('min_cgpa', 0)
+            max_bl   = drive_doc.get('max_backlogs', 0)
+
+            # one round-trip: match eligible students and join their user docs
+            pipeline = [
+                {'$match': {'branch': {'$in': allowed},
+                            'cgpa':   {'$gte': min_cgpa},
+                            'backlogs': {'$lte': max_bl}}},
+                {'$lookup': {'from': 'users', 'localField': 'user_id',
+                             'foreignField': '_id', 'as': 'u'}},
+                {'$unwind': '$u'},
+                {'$project': {'name': '$u.name', 'email': '$u.email',
+                              'roll_number': 1, 'branch': 1, 'cgpa': 1,
+                              'backlogs': 1, 'skills': 1}},
+            ]
+            for s in db.students.aggregate(pipeline):
+                eligible.append({
+                    'name': s['name'], 'email': s['email'],
+                    'roll_number': s.get('roll_number',''), 'branch': s.get('branch',''),
+                    'cgpa': s.get('cgpa',0), 'backlogs': s.get('backlogs',0),
+                    'skills': s.get('skills','')
+                })
             total_eligible = len(eligible)
 
             if action == 'notify':
-                sent = 0
-                for e in eligible:
+                sent    = 0
+                subject = f"Placement Drive: {drive_doc['job_role']} at {drive_doc['company_name']}"
+                details = f"You are eligible for the upcoming placement drive:\n\nCompany : {drive_doc['company_name']}\nRole    : {drive_doc['job_role']}\nMin CGPA: {drive_doc['min_cgpa']}\n\nLog in to PlacementPro to apply.\n\nTPO Office"
+                if eligible:
                     try:
-                        msg = Message(
-                            subject=f"Placement Drive: {drive_doc['job_role']} at {drive_doc['company_name']}",
-                            recipients=[e['email']],
-                            body=f"Dear {e['name']},\n\nYou are eligible for the upcoming placement drive:\n\nCompany : {drive_doc['company_name']}\nRole    : {drive_doc['job_role']}\nMin CGPA: {drive_doc['min_cgpa']}\n\nLog in to PlacementPro to apply.\n\nTPO Office"
-                        )
-                        mail.send(msg)
-                        sent += 1
+                        # reuse one SMTP session for every recipient
+                        with mail.connect() as conn:
+                            for e in eligible:
+                                try:
+                                    conn.send(Message(subject=subject, recipients=[e['email']],
+                                                      body=f"Dear {e['name']},\n\n{details}"))
+                                    sent += 1
+                                except Exception:
+                                    pass
                     except Exception:
                         pass
                 flash(f'Notifications sent to {sent} eligible students.', 'success')
@@ -365,22 +579,23 @@ def admin_scheduler():
     if request.method == 'POST':
         action = request.form.get('action')
         if action == 'schedule':
-            drive_id   = request.form.get('drive_id')
+            drive_id   = oid(request.form.get('drive_id'))
             student_id = request.form.get('student_id')
             time_slot  = parse_dt(request.form.get('time_slot'))
             venue      = request.form.get('venue', '').strip()
             notes      = request.form.get('notes', '').strip()
-            if time_slot:
-                # overlap check: same student at same time
-                if db.interviews.find_one({'student_id': student_id, 'time_slot': time_slot}):
-                    flash('This student already has an interview at that time.', 'danger')
-                else:
+            if time_slot and drive_id and oid(student_id):
+                # overlap check: the unique (student_id, time_slot) index rejects clashes
+                try:
                     db.interviews.update_one(
                         {'drive_id': drive_id, 'student_id': student_id},
                         {'$set': {'time_slot': time_slot, 'venue': venue, 'notes': notes,
                                   'drive_id': drive_id, 'student_id': student_id}},
                         upsert=True
                     )
+                except DuplicateKeyError:
+                    flash('This student already has an interview at that time.', 'danger')
+                else:
                     db.applications.update_one(
                         {'student_id': student_id, 'drive_id': drive_id},
                         {'$set': {'status': 'interview_scheduled'}}
@@ -391,26 +606,41 @@ def admin_scheduler():
             flash('Interview removed.', 'info')
 
     drives_raw   = list(db.drives.find({}, {'company_name':1,'job_role':1}).sort('drive_date', 1))
-    drives       = [{'id': sid(d), 'company_name': d['company_name'], 'job_role': d['job_role']} for d in drives_raw]
-    students_raw = list(db.students.find())
+    drives       = [{'id': str(d['_id']), 'company_name': d['company_name'], 'job_role': d['job_role']} for d in drives_raw]
+    students_raw = list(db.students.find({}, {'user_id':1,'branch':1,'cgpa':1}))
+    uids         = [s['user_id'] for s in students_raw]
+    users_map    = {u['_id']: u for u in db.users.find({'_id': {'$in': uids}}, {'name':1})}
     students     = []
     for s in students_raw:
-        u = db.users.find_one({'_id': oid(s['user_id'])}, {'name':1})
+        u = users_map.get(s['user_id'])
         if u:
-            students.append({'id': sid(s), 'name': u['name'],
+            students.append({'id': str(s['_id']), 'name': u['name'],
                              'branch': s.get('branch',''), 'cgpa': s.get('cgpa',0)})
 
-    interviews_raw = list(db.interviews.find().sort('time_slot', 1))
+    # interview -> student -> user, and interview -> drive, in one aggregation
+    pipeline = [
+        {'$sort': {'time_slot': 1}},
+        {'$addFields': {'sid_obj': {'$convert': {'input': '$student_id', 'to': 'objectId',
+                                                  'onError': None, 'onNull': None}}}},
+        {'$lookup': {'from': 'students', 'localField': 'sid_obj',
+                     'foreignField': '_id', 'as': 's'}},
+        {'$unwind': {'path': '$s', 'preserveNullAndEmptyArrays': True}},
+        {'$lookup': {'from': 'users', 'localField': 's.user_id',
+                     'foreignField': '_id', 'as': 'u'}},
+        {'$lookup': {'from': 'drives', 'localField': 'drive_id',
+                     'foreignField': '_id', 'as': 'd'}},
+        {'$project': {'student_name': {'$arrayElemAt': ['$u.name', 0]},
+                      'company_name': {'$arrayElemAt': ['$d.company_name', 0]},
+                      'job_role':     {'$arrayElemAt': ['$d.job_role', 0]},
+                      'time_slot': 1, 'venue': 1, 'notes': 1}},
+    ]
     interviews = []
-    for iv in interviews_raw:
-        s = db.students.find_one({'_id': oid(iv['student_id'])})
-        u = db.users.find_one({'_id': oid(s['user_id'])}) if s else None
-        d = db.drives.find_one({'_id': oid(iv['drive_id'])})
+    for iv in db.interviews.aggregate(pipeline):
         interviews.append({
-            'id': sid(iv),
-            'student_name': u['name'] if u else '?',
-            'company_name': d['company_name'] if d else '?',
-            'job_role':     d['job_role'] if d else '?',
+            'id': str(iv['_id']),
+            'student_name': iv.get('student_name', '?'),
+            'company_name': iv.get('company_name', '?'),
+            'job_role':     iv.get('job_role', '?'),
             'time_slot':    iv.get('time_slot'),
             'venue':        iv.get('venue',''),
             'notes':        iv.get('notes',''),
@@ -422,37 +652,40 @@ def admin_scheduler():
 @role_required('admin')
 def admin_analytics():
     # Branch-wise placed
-    selected_apps = list(db.applications.find({'status': 'selected'}))
-    branch_count  = {}
-    for a in selected_apps:
-        s = db.students.find_one({'_id': oid(a['student_id'])})
-        if s and s.get('branch'):
-            b = s['branch']
-            branch_count[b] = branch_count.get(b, 0) + 1
-    branch_data = [{'branch': k, 'count': v} for k, v in branch_count.items()]
+    pipeline = [
+        {'$match': {'status': 'selected'}},
+        {'$addFields': {'sid_obj': {'$convert': {'input': '$student_id', 'to': 'objectId',
+                                                  'onError': None, 'onNull': None}}}},
+        {'$lookup': {'from': 'students', 'localField': 'sid_obj',
+                     'foreignField': '_id', 'as': 's'}},
+        {'$unwind': '$s'},
+        {'$group': {'_id': '$s.branch', 'count': {'$sum': 1}}},
+    ]
+    branch_data = [{'branch': r['_id'], 'count': r['count']}
+                   for r in db.applications.aggregate(pipeline) if r['_id']]
 
     # Status breakdown
-    status_counts = {}
-    for a in db.applications.find():
-        st = a.get('status', 'applied')
-        status_counts[st] = status_counts.get(st, 0) + 1
-    status_data = [{'status': k, 'count': v} for k, v in status_counts.items()]
+    status_data = [{'status': r['_id'] or 'applied', 'count': r['count']}
+                   for r in db.applications.aggregate(
+                       [{'$group': {'_id': '$status', 'count': {'$sum': 1}}}])]
 
     # Drive stats
-    drive_stats = []
-    for d in db.drives.find().sort('created_at', DESCENDING).limit(10):
-        did   = sid(d)
-        total = db.applications.count_documents({'drive_id': did})
-        sel   = db.applications.count_documents({'drive_id': did, 'status': 'selected'})
-        drive_stats.append({'company_name': d['company_name'], 'applicants': total, 'selected': sel})
-
-    # Top skills
-    skill_count = {}
-    for row in db.market_skills.find():
-        for sk in row.get('required_skills', []):
-            skill_count[sk] = skill_count.get(sk, 0) + 1
-    top_skills = sorted(skill_count.items(), key=lambda x: x[1], reverse=True)[:10]
-    top_skills = [{'skill': k, 'count': v} for k, v in top_skills]
+    recent = list(db.drives.find({}, {'company_name':1}).sort('created_at', DESCENDING).limit(10))
+    totals, selected = {}, {}
+    for r in db.applications.aggregate([
+            {'$match': {'drive_id': {'$in': [d['_id'] for d in recent]}}},
+            {'$group': {'_id': {'drive_id': '$drive_id',
+                                'sel': {'$eq': ['$status', 'selected']}},
+                        'n': {'$sum': 1}}}]):
+        did = r['_id']['drive_id']
+        totals[did] = totals.get(did, 0) + r['n']
+        if r['_id']['sel']:
+            selected[did] = r['n']
+    drive_stats = [{'company_name': d['company_name'],
+                    'applicants': totals.get(d['_id'], 0),
+                    'selected':   selected.get(d['_id'], 0)} for d in recent]
+
+    top_skills = cached('top_skills', _top_skills)
 
     total_students = db.users.count_documents({'role': 'student'})
     total_placed   = db.applications.count_documents({'status': 'selected'})
@@ -462,6 +695,20 @@ def admin_analytics():
         status_data=status_data, top_skills=top_skills,
         total_students=total_students, total_placed=total_placed)
 
+def _top_skills():
+    pipeline = [
+        {'$unwind': '$required_skills'},
+        {'$group': {'_id': '$required_skills', 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1, '_id': 1}},
+        {'$limit': 10},
+    ]
+    return [{'skill': r['_id'], 'count': r['count']} for r in db.market_skills.aggregate(pipeline)]
+
+def _faq_list():
+    return [{'id': str(f['_id']), 'question': f['question'], 'answer': f['answer'],
+             'keywords': f.get('keywords',''), 'created_at': f.get('created_at')}
+            for f in db.faqs.find().sort('created_at', 1)]
+
 @app.route('/admin/faqs', methods=['GET', 'POST'])
 @role_required('admin')
 def admin_faqs():
@@ -482,23 +729,37 @@ def admin_faqs():
             db.faqs.update_one({'_id': oid(request.form.get('faq_id'))},
                                {'$set': {'answer': request.form.get('answer', '').strip()}})
             flash('FAQ updated.', 'success')
+        invalidate('faqs')
+        invalidate('faq_index')
 
-    faqs_raw = list(db.faqs.find().sort('created_at', 1))
-    faqs = [{'id': sid(f), 'question': f['question'], 'answer': f['answer'],
-              'keywords': f.get('keywords',''), 'created_at': f.get('created_at')} for f in faqs_raw]
-    return render_template('admin/faqs.html', faqs=faqs)
+    return render_template('admin/faqs.html', faqs=cached('faqs', _faq_list))
 
 @app.route('/admin/applications')
 @role_required('admin')
 def admin_applications():
-    apps_raw = list(db.applications.find().sort('applied_at', DESCENDING))
+    per_page = 50
+    page     = max(request.args.get('page', 1, type=int), 1)
+    total    = db.applications.estimated_document_count()
+    apps_raw = list(db.applications.find()
+                    .sort('applied_at', DESCENDING)
+                    .skip((page - 1) * per_page).limit(per_page))
+    # resolve students, users and drives with one $in query each
+    sids     = {oid(a['student_id']) for a in apps_raw}
+    dids     = {a['drive_id'] for a in apps_raw}
+    # keyed by the ids as stored on applications, so rows need no conversion
+    students = {str(s['_id']): s for s in db.students.find({'_id': {'$in': list(sids)}},
+                                                           {'user_id':1,'branch':1,'cgpa':1})}
+    uids     = {s['user_id'] for s in students.values()}
+    users    = {u['_id']: u for u in db.users.find({'_id': {'$in': list(uids)}}, {'name':1})}
+    drives   = {d['_id']: d for d in db.drives.find({'_id': {'$in': list(dids)}},
+                                                    {'company_name':1,'job_role':1})}
     apps = []
     for a in apps_raw:
-        s = db.students.find_one({'_id': oid(a['student_id'])})
-        u = db.users.find_one({'_id': oid(s['user_id'])}) if s else None
-        d = db.drives.find_one({'_id': oid(a['drive_id'])})
+        s = students.get(a['student_id'])
+        u = users.get(s['user_id']) if s else None
+        d = drives.get(a['drive_id'])
         apps.append({
-            'id': sid(a),
+            'id': str(a['_id']),
             'student_name': u['name'] if u else '?',
             'branch': s.get('branch','') if s else '',
             'cgpa':   s.get('cgpa', 0) if s else 0,
@@ -507,7 +768,8 @@ def admin_applications():
             'status':       a.get('status','applied'),
             'applied_at':   a.get('applied_at'),
         })
-    return render_template('admin/applications.html', applications=apps)
+    return render_template('admin/applications.html', applications=apps,
+        page=page, total=total, has_next=page * per_page < total)
 
 @app.route('/admin/update-status', methods=['POST'])
 @role_required('admin')
@@ -518,13 +780,13 @@ def admin_update_status():
         db.applications.update_one({'_id': oid(request.form.get('app_id'))},
                                    {'$set': {'status': status}})
         flash('Status updated.', 'success')
-    return redirect(url_for('admin_applications'))
+    return redirect(url_for('admin_applications', page=request.form.get('page', 1, type=int)))
 
 # ── STUDENT ───────────────────────────────────────────────────
 @app.route('/student/dashboard')
 @role_required('student')
 def student_dashboard():
-    s = get_student()
+    s = get_student_summary()
     student = None
     eligible_drives = []
     apps = []
@@ -532,21 +794,40 @@ def student_dashboard():
     if s:
         student = {
             'id': sid(s), 'branch': s.get('branch',''), 'cgpa': s.get('cgpa',0),
-            'backlogs': s.get('backlogs',0), 'skills': s.get('skills',''),
+            'backlogs': s.get('backlogs',0),
             'profile_complete': s.get('profile_complete', False)
         }
-        for d in db.drives.find({'status': {'$ne': 'completed'}}):
-            allowed = d.get('allowed_branches', [])
-            if (s.get('branch') in allowed and
-                float(s.get('cgpa') or 0) >= float(d.get('min_cgpa') or 0) and
-                int(s.get('backlogs') or 0) <= int(d.get('max_backlogs') or 0)):
-                app_doc = db.applications.find_one({'student_id': sid(s), 'drive_id': sid(d)})
-                entry   = fmt_drive(d)
-                entry['application'] = {'id': sid(app_doc), 'status': app_doc['status']} if app_doc else None
-                eligible_drives.append(entry)
-
-        for a in db.applications.find({'student_id': sid(s)}).sort('applied_at', DESCENDING).limit(5):
-            d = db.drives.find_one({'_id': oid(a['drive_id'])})
+        s_cgpa     = float(s.get('cgpa') or 0)
+        s_backlogs = int(s.get('backlogs') or 0)
+        # eligible open drives plus this student's application, in one round-trip
+        pipeline = [
+            {'$match': {'status': {'$ne': 'completed'},
+                        'allowed_branches': s.get('branch'),
+                        # missing cutoffs count as 0, same as student_drives
+                        '$expr': {'$and': [
+                            {'$lte': [{'$ifNull': ['$min_cgpa', 0]}, s_cgpa]},
+                            {'$gte': [{'$ifNull': ['$max_backlogs', 0]}, s_backlogs]}]}}},
+            {'$project': {'company_name':1,'job_role':1,'package_lpa':1,'min_cgpa':1,
+                          'allowed_branches':1,'max_backlogs':1,'drive_date':1,
+                          'venue':1,'status':1}},
+            {'$lookup': {'from': 'applications',
+                         'let': {'did': '$_id'},
+                         'pipeline': [
+                             {'$match': {'$expr': {'$and': [
+                                 {'$eq': ['$drive_id', '$$did']},
+                                 {'$eq': ['$student_id', sid(s)]}]}}},
+                             {'$project': {'status': 1}}],
+                         'as': 'app'}},
+        ]
+        for d in db.drives.aggregate(pipeline):
+            app_doc = d['app'][0] if d['app'] else None
+            entry   = fmt_drive(d)
+            entry['application'] = {'id': sid(app_doc), 'status': app_doc['status']} if app_doc else None
+            eligible_drives.append(entry)
+
+        for a in (db.applications.find({'student_id': sid(s)}, {'drive_id':1,'status':1,'applied_at':1})
+                  .sort('applied_at', DESCENDING).limit(5)):
+            d = db.drives.find_one({'_id': a['drive_id']}, {'company_name':1,'job_role':1})
             apps.append({'company_name': d['company_name'] if d else '?',
                          'job_role':     d['job_role'] if d else '?',
                          'status':       a.get('status','applied'),
@@ -558,7 +839,7 @@ def student_dashboard():
 @app.route('/student/profile', methods=['GET', 'POST'])
 @role_required('student')
 def student_profile():
-    u = db.users.find_one({'_id': oid(session['user_id'])})
+    u = db.users.find_one({'_id': oid(session['user_id'])}, {'name':1,'email':1})
     if request.method == 'POST':
         name   = request.form.get('name', '').strip()
         fields = {
@@ -577,7 +858,8 @@ def student_profile():
         }
         fields['profile_complete'] = bool(
             fields['roll_number'] and fields['branch'] and fields['cgpa'] and fields['phone'] and fields['skills'])
-        db.students.update_one({'user_id': session['user_id']}, {'$set': fields})
+        db.students.update_one({'user_id': oid(session['user_id'])}, {'$set': fields})
+        session.pop('student', None)
         if name:
             db.users.update_one({'_id': oid(session['user_id'])}, {'$set': {'name': name}})
             session['user_name'] = name
@@ -599,7 +881,7 @@ def student_profile():
 @app.route('/student/resume-wizard')
 @role_required('student')
 def resume_wizard():
-    u = db.users.find_one({'_id': oid(session['user_id'])})
+    u = db.users.find_one({'_id': oid(session['user_id'])}, {'name':1,'email':1})
     s = get_student() or {}
     profile = {
         'name': u['name'] if u else '', 'email': u['email'] if u else '',
@@ -611,10 +893,23 @@ def resume_wizard():
     }
     return render_template('student/resume_wizard.html', profile=profile)
 
+# Resume PDF styles, built once and shared read-only across requests
+_STYLES       = getSampleStyleSheet()
+_ACCENT       = colors.HexColor('#3730a3')
+_RULE         = colors.HexColor('#e5e7eb')
+_RESUME_TITLE = ParagraphStyle('T', parent=_STYLES['Title'], fontSize=20,
+                               textColor=_ACCENT, spaceAfter=2, alignment=TA_CENTER)
+_RESUME_SUB   = ParagraphStyle('S', parent=_STYLES['Normal'], fontSize=10,
+                               textColor=colors.HexColor('#6b7280'), spaceAfter=2, alignment=TA_CENTER)
+_RESUME_SEC   = ParagraphStyle('H', parent=_STYLES['Heading2'], fontSize=12,
+                               textColor=_ACCENT, spaceBefore=10, spaceAfter=4)
+_RESUME_BODY  = ParagraphStyle('B', parent=_STYLES['Normal'], fontSize=10, spaceAfter=3, leading=14)
+_RESUME_BULL  = ParagraphStyle('L', parent=_STYLES['Normal'], fontSize=10, spaceAfter=2, leftIndent=15, leading=13)
+
 @app.route('/student/download-resume')
 @role_required('student')
 def download_resume():
-    u = db.users.find_one({'_id': oid(session['user_id'])})
+    u = db.users.find_one({'_id': oid(session['user_id'])}, {'name':1,'email':1})
     s = get_student() or {}
     if not u:
         flash('Profile not found.', 'danger')
@@ -624,15 +919,8 @@ def download_resume():
     doc    = SimpleDocTemplate(buffer, pagesize=A4,
                                rightMargin=2*cm, leftMargin=2*cm,
                                topMargin=2*cm, bottomMargin=2*cm)
-    styles = getSampleStyleSheet()
-    title_s = ParagraphStyle('T', parent=styles['Title'], fontSize=20,
-                              textColor=colors.HexColor('#3730a3'), spaceAfter=2, alignment=TA_CENTER)
-    sub_s   = ParagraphStyle('S', parent=styles['Normal'], fontSize=10,
-                              textColor=colors.HexColor('#6b7280'), spaceAfter=2, alignment=TA_CENTER)
-    sec_s   = ParagraphStyle('H', parent=styles['Heading2'], fontSize=12,
-                              textColor=colors.HexColor('#3730a3'), spaceBefore=10, spaceAfter=4)
-    body_s  = ParagraphStyle('B', parent=styles['Normal'], fontSize=10, spaceAfter=3, leading=14)
-    bull_s  = ParagraphStyle('L', parent=styles['Normal'], fontSize=10, spaceAfter=2, leftIndent=15, leading=13)
+    title_s, sub_s, sec_s = _RESUME_TITLE, _RESUME_SUB, _RESUME_SEC
+    body_s,  bull_s       = _RESUME_BODY, _RESUME_BULL
 
     story = []
     name  = u.get('name', 'Name')
@@ -645,11 +933,11 @@ def download_resume():
     if s.get('linkedin'):    cp.append(s['linkedin'])
     if s.get('github'):      cp.append(s['github'])
     story.append(Paragraph(' | '.join(cp), sub_s))
-    story.append(HRFlowable(width='100%', thickness=2, color=colors.HexColor('#3730a3'), spaceAfter=6))
+    story.append(HRFlowable(width='100%', thickness=2, color=_ACCENT, spaceAfter=6))
 
     # Education
     story.append(Paragraph('Education', sec_s))
-    story.append(HRFlowable(width='100%', thickness=0.5, color=colors.HexColor('#e5e7eb'), spaceAfter=4))
+    story.append(HRFlowable(width='100%', thickness=0.5, color=_RULE, spaceAfter=4))
     edu = Table([
         [Paragraph(f"<b>Branch:</b> {s.get('branch','—')}", body_s),
          Paragraph(f"<b>CGPA:</b> {s.get('cgpa','—')}", body_s)],
@@ -663,7 +951,7 @@ def download_resume():
     def section(title, text):
         if not text: return
         story.append(Paragraph(title, sec_s))
-        story.append(HRFlowable(width='100%', thickness=0.5, color=colors.HexColor('#e5e7eb'), spaceAfter=4))
+        story.append(HRFlowable(width='100%', thickness=0.5, color=_RULE, spaceAfter=4))
         for line in text.split('\n'):
             line = line.strip()
             if line: story.append(Paragraph(f'• {line}', bull_s))
@@ -676,26 +964,40 @@ def download_resume():
 
     doc.build(story)
     buffer.seek(0)
-    response = make_response(buffer.read())
-    response.headers['Content-Type'] = 'application/pdf'
     fname = f"{name.replace(' ','_')}_Resume.pdf"
-    response.headers['Content-Disposition'] = f'attachment; filename="{fname}"'
-    return response
+    return send_file(buffer, mimetype='application/pdf',
+                     as_attachment=True, download_name=fname)
 
 @app.route('/student/drives')
 @role_required('student')
 def student_drives():
-    s = get_student()
+    s = get_student_summary()
     eligible_drives = []
     if s:
-        for d in db.drives.find().sort('drive_date', 1):
-            allowed    = d.get('allowed_branches', [])
-            is_eligible= (s.get('branch') in allowed and
-                          float(s.get('cgpa') or 0) >= float(d.get('min_cgpa') or 0) and
-                          int(s.get('backlogs') or 0) <= int(d.get('max_backlogs') or 0))
-            app_doc = db.applications.find_one({'student_id': sid(s), 'drive_id': sid(d)})
+        # the page lists ineligible drives too, so Mongo flags eligibility rather than filtering
+        pipeline = [
+            {'$sort': {'drive_date': 1}},
+            {'$project': {'company_name':1,'job_role':1,'package_lpa':1,'min_cgpa':1,
+                          'allowed_branches':1,'max_backlogs':1,'drive_date':1,
+                          'venue':1,'description':1,'status':1}},
+            {'$addFields': {'is_eligible': {'$and': [
+                {'$in': [{'$literal': s.get('branch')}, {'$ifNull': ['$allowed_branches', []]}]},
+                {'$gte': [float(s.get('cgpa') or 0), {'$ifNull': ['$min_cgpa', 0]}]},
+                {'$lte': [int(s.get('backlogs') or 0), {'$ifNull': ['$max_backlogs', 0]}]}]}}},
+            {'$lookup': {'from': 'applications',
+                         'let': {'d': '$_id'},
+                         'pipeline': [
+                             {'$match': {'$expr': {'$and': [
+                                 {'$eq': ['$drive_id', '$$d']},
+                                 {'$eq': ['$student_id', sid(s)]}]}}},
+                             {'$project': {'status': 1}}],
+                         'as': 'app'}},
+            {'$unwind': {'path': '$app', 'preserveNullAndEmptyArrays': True}},
+        ]
+        for d in db.drives.aggregate(pipeline):
+            app_doc = d.get('app')
             entry   = fmt_drive(d)
-            entry['is_eligible']  = is_eligible
+            entry['is_eligible']  = d['is_eligible']
             entry['application']  = {'id': sid(app_doc), 'status': app_doc['status']} if app_doc else None
             eligible_drives.append(entry)
     student = {'id': sid(s), 'branch': s.get('branch'), 'cgpa': s.get('cgpa'), 'backlogs': s.get('backlogs')} if s else None
@@ -704,61 +1006,80 @@ def student_drives():
 @app.route('/student/apply/<drive_id>', methods=['POST'])
 @role_required('student')
 def student_apply(drive_id):
-    s = get_student()
+    s = get_student_summary()
     if not s:
         flash('Complete your profile first.', 'warning')
         return redirect(url_for('student_drives'))
-    existing = db.applications.find_one({'student_id': sid(s), 'drive_id': drive_id})
-    if existing:
-        flash('You already applied to this drive.', 'info')
-    else:
+    did = oid(drive_id)
+    if not did:
+        flash('Drive not found.', 'danger')
+        return redirect(url_for('student_drives'))
+    # the unique (student_id, drive_id) index rejects duplicate applications
+    try:
         db.applications.insert_one({
-            'student_id': sid(s), 'drive_id': drive_id,
+            'student_id': sid(s), 'drive_id': did,
             'status': 'applied', 'applied_at': datetime.utcnow()
         })
         flash('Applied successfully!', 'success')
+    except DuplicateKeyError:
+        flash('You already applied to this drive.', 'info')
     return redirect(url_for('student_drives'))
 
 @app.route('/student/applications')
 @role_required('student')
 def student_applications():
-    s = get_student()
-    apps = []
+    s = get_student_summary()
+    apps = ()
     if s:
-        for a in db.applications.find({'student_id': sid(s)}).sort('applied_at', DESCENDING):
-            d = db.drives.find_one({'_id': oid(a['drive_id'])})
-            iv = db.interviews.find_one({'student_id': sid(s), 'drive_id': a['drive_id']})
-            apps.append({
-                'company_name':    d['company_name'] if d else '?',
-                'job_role':        d['job_role'] if d else '?',
-                'package_lpa':     d.get('package_lpa') if d else None,
-                'drive_date':      d.get('drive_date') if d else None,
-                'venue':           d.get('venue') if d else '',
-                'status':          a.get('status','applied'),
-                'applied_at':      a.get('applied_at'),
-                'interview_time':  iv.get('time_slot') if iv else None,
-                'interview_venue': iv.get('venue') if iv else '',
-            })
-    return render_template('student/applications.html', apps=apps)
+        # applications with their drive and interview, in one round-trip
+        pipeline = [
+            {'$match': {'student_id': sid(s)}},
+            {'$sort': {'applied_at': -1}},
+            {'$lookup': {'from': 'drives', 'localField': 'drive_id',
+                         'foreignField': '_id', 'as': 'd'}},
+            {'$lookup': {'from': 'interviews',
+                         'let': {'did': '$drive_id', 'sid': '$student_id'},
+                         'pipeline': [{'$match': {'$expr': {'$and': [
+                             {'$eq': ['$drive_id', '$$did']},
+                             {'$eq': ['$student_id', '$$sid']}]}}}],
+                         'as': 'iv'}},
+            {'$unwind': {'path': '$d', 'preserveNullAndEmptyArrays': True}},
+            {'$unwind': {'path': '$iv', 'preserveNullAndEmptyArrays': True}},
+            {'$project': {'company_name': '$d.company_name', 'job_role': '$d.job_role',
+                          'package_lpa': '$d.package_lpa', 'drive_date': '$d.drive_date',
+                          'venue': '$d.venue', 'status': 1, 'applied_at': 1,
+                          'interview_time': '$iv.time_slot', 'interview_venue': '$iv.venue'}},
+        ]
+        apps = ({
+            'company_name':    a.get('company_name', '?'),
+            'job_role':        a.get('job_role', '?'),
+            'package_lpa':     a.get('package_lpa'),
+            'drive_date':      a.get('drive_date'),
+            'venue':           a.get('venue', ''),
+            'status':          a.get('status','applied'),
+            'applied_at':      a.get('applied_at'),
+            'interview_time':  a.get('interview_time'),
+            'interview_venue': a.get('interview_venue', ''),
+        } for a in db.applications.aggregate(pipeline))
+    return render_stream('student/applications.html', apps=apps)
 
 # ── ALUMNI ────────────────────────────────────────────────────
 @app.route('/alumni/dashboard')
 @role_required('alumni')
+@cached_page()
 def alumni_dashboard():
     al = get_alumni_profile()
     stats = {'referrals': 0, 'slots': 0, 'booked': 0}
     recent_referrals = []
     if al:
-        aid = sid(al)
+        aid = al['_id']
         stats['referrals'] = db.referrals.count_documents({'alumni_id': aid})
         stats['slots']     = db.mentorship_slots.count_documents({'alumni_id': aid})
         stats['booked']    = db.mentorship_slots.count_documents({'alumni_id': aid, 'booked_by': {'$ne': None}})
-    for r in db.referrals.find().sort('posted_at', DESCENDING).limit(5):
-        al2 = db.alumni.find_one({'_id': oid(r['alumni_id'])})
-        u2  = db.users.find_one({'_id': oid(al2['user_id'])}) if al2 else None
+    for r in referrals_with_poster(limit=5):
         recent_referrals.append({
             'company': r['company'], 'job_role': r['job_role'],
-            'description': r.get('description',''), 'posted_by': u2['name'] if u2 else '?',
+            'description': r.get('description',''), 'posted_by': r.get('posted_by', '?'),
             'deadline': r.get('deadline')
         })
     return render_template('alumni/dashboard.html', stats=stats, recent_referrals=recent_referrals)
@@ -774,29 +1095,34 @@ def alumni_referrals():
             job_role = request.form.get('job_role', '').strip()
             if company and job_role:
                 db.referrals.insert_one({
-                    'alumni_id':   sid(al), 'company': company, 'job_role': job_role,
+                    'alumni_id':   al['_id'], 'company': company, 'job_role': job_role,
                     'description': request.form.get('description','').strip(),
                     'apply_link':  request.form.get('apply_link','').strip(),
                     'deadline':    parse_date(request.form.get('deadline')),
                     'posted_at':   datetime.utcnow(),
                 })
                 flash('Referral posted!', 'success')
+                invalidate_pages()
         elif action == 'delete':
-            db.referrals.delete_one({'_id': oid(request.form.get('ref_id')), 'alumni_id': sid(al)})
+            db.referrals.delete_one({'_id': oid(request.form.get('ref_id')), 'alumni_id': al['_id']})
             flash('Referral deleted.', 'info')
-
-    referrals = []
-    for r in db.referrals.find().sort('posted_at', DESCENDING):
-        al2 = db.alumni.find_one({'_id': oid(r['alumni_id'])})
-        u2  = db.users.find_one({'_id': oid(al2['user_id'])}) if al2 else None
-        referrals.append({
-            'id': sid(r), 'company': r['company'], 'job_role': r['job_role'],
-            'description': r.get('description',''), 'apply_link': r.get('apply_link',''),
-            'deadline': r.get('deadline'), 'posted_by': u2['name'] if u2 else '?',
-            'posted_at': r.get('posted_at'),
-            'is_mine': al and r['alumni_id'] == sid(al)
-        })
-    return render_template('alumni/referrals.html', referrals=referrals)
+            invalidate_pages()
+
+    etag, meta = collection_etag(db.referrals)
+    hit = not_modified(etag)
+    if hit:
+        return hit
+
+    my_id     = al['_id'] if al else None
+    referrals = ({
+        'id': str(r['_id']), 'company': r['company'], 'job_role': r['job_role'],
+        'description': r.get('description',''), 'apply_link': r.get('apply_link',''),
+        'deadline': r.get('deadline'), 'posted_by': r.get('posted_by', '?'),
+        'posted_at': r.get('posted_at'),
+        'is_mine': al and r['alumni_id'] == my_id
+    } for r in referrals_with_poster())
+    return revalidate(render_stream('alumni/referrals.html', referrals=referrals,
+        referral_count=meta['n']), etag)
 
 @app.route('/alumni/mentorship', methods=['GET', 'POST'])
 @role_required('alumni')
@@ -808,34 +1134,55 @@ def alumni_mentorship():
             t = parse_dt(request.form.get('available_time'))
             if t:
                 db.mentorship_slots.insert_one({
-                    'alumni_id': sid(al), 'available_time': t,
+                    'alumni_id': al['_id'], 'available_time': t,
                     'meeting_link': request.form.get('meeting_link','').strip(),
                     'booked_by': None
                 })
                 flash('Slot added!', 'success')
+                invalidate_pages()
         elif action == 'delete_slot':
-            db.mentorship_slots.delete_one({'_id': oid(request.form.get('slot_id')), 'alumni_id': sid(al)})
+            db.mentorship_slots.delete_one({'_id': oid(request.form.get('slot_id')), 'alumni_id': al['_id']})
             flash('Slot removed.', 'info')
+            invalidate_pages()
 
     my_slots = []
     if al:
-        for ms in db.mentorship_slots.find({'alumni_id': sid(al)}).sort('available_time', 1):
-            booker_name = None
-            if ms.get('booked_by'):
-                s = db.students.find_one({'_id': oid(ms['booked_by'])})
-                u = db.users.find_one({'_id': oid(s['user_id'])}) if s else None
-                booker_name = u['name'] if u else None
-            my_slots.append({'id': sid(ms), 'available_time': ms.get('available_time'),
-                             'meeting_link': ms.get('meeting_link',''), 'booked_by_name': booker_name})
+        pipeline = [
+            {'$match': {'alumni_id': al['_id']}},
+            {'$sort': {'available_time': 1}},
+            {'$addFields': {'sid_obj': {'$convert': {'input': '$booked_by', 'to': 'objectId',
+                                                      'onError': None, 'onNull': None}}}},
+            {'$lookup': {'from': 'students', 'localField': 'sid_obj',
+                         'foreignField': '_id', 'as': 's'}},
+            {'$unwind': {'path': '$s', 'preserveNullAndEmptyArrays': True}},
+            {'$lookup': {'from': 'users', 'localField': 's.user_id',
+                         'foreignField': '_id', 'as': 'u'}},
+            {'$project': {'available_time': 1, 'meeting_link': 1,
+                          'booked_by_name': {'$arrayElemAt': ['$u.name', 0]}}},
+        ]
+        for ms in db.mentorship_slots.aggregate(pipeline):
+            my_slots.append({'id': str(ms['_id']), 'available_time': ms.get('available_time'),
+                             'meeting_link': ms.get('meeting_link',''),
+                             'booked_by_name': ms.get('booked_by_name')})
 
     available_slots = []
-    for ms in db.mentorship_slots.find({'booked_by': None}).sort('available_time', 1):
-        al2 = db.alumni.find_one({'_id': oid(ms['alumni_id'])})
-        u2  = db.users.find_one({'_id': oid(al2['user_id'])}) if al2 else None
+    pipeline = [
+        {'$match': {'booked_by': None}},
+        {'$sort': {'available_time': 1}},
+        {'$lookup': {'from': 'alumni', 'localField': 'alumni_id',
+                     'foreignField': '_id', 'as': 'al'}},
+        {'$unwind': {'path': '$al', 'preserveNullAndEmptyArrays': True}},
+        {'$lookup': {'from': 'users', 'localField': 'al.user_id',
+                     'foreignField': '_id', 'as': 'u'}},
+        {'$project': {'available_time': 1, 'meeting_link': 1,
+                      'alumni_name': {'$arrayElemAt': ['$u.name', 0]},
+                      'company': '$al.company', 'designation': '$al.designation'}},
+    ]
+    for ms in db.mentorship_slots.aggregate(pipeline):
         available_slots.append({
-            'id': sid(ms), 'alumni_name': u2['name'] if u2 else '?',
-            'company': al2.get('company','') if al2 else '',
-            'designation': al2.get('designation','') if al2 else '',
+            'id': str(ms['_id']), 'alumni_name': ms.get('alumni_name', '?'),
+            'company': ms.get('company', ''),
+            'designation': ms.get('designation', ''),
             'available_time': ms.get('available_time'),
             'meeting_link':   ms.get('meeting_link',''),
         })
@@ -844,7 +1191,7 @@ def alumni_mentorship():
 @app.route('/alumni/book-slot/<slot_id>', methods=['POST'])
 @role_required('student')
 def book_mentorship_slot(slot_id):
-    s = get_student()
+    s = get_student_summary()
     if s:
         result = db.mentorship_slots.update_one(
             {'_id': oid(slot_id), 'booked_by': None},
@@ -852,16 +1199,21 @@ def book_mentorship_slot(slot_id):
         )
         if result.modified_count:
             flash('Slot booked!', 'success')
+            invalidate_pages()
         else:
             flash('Slot already booked or unavailable.', 'warning')
     return redirect(url_for('alumni_mentorship'))
 
 # ── MARKET INTELLIGENCE ───────────────────────────────────────
+def _market_roles():
+    """Map role id -> market_skills doc; the collection is static seed data."""
+    return {str(r['_id']): r for r in db.market_skills.find()}
+
 @app.route('/market/skill-gap', methods=['GET', 'POST'])
 @login_required
 def skill_gap():
-    roles_raw = list(db.market_skills.find({}, {'job_role': 1}))
-    roles     = [{'id': sid(r), 'job_role': r['job_role']} for r in roles_raw]
+    market    = cached('market_roles', _market_roles)
+    roles     = [{'id': rid, 'job_role': r['job_role']} for rid, r in market.items()]
     result    = None
     selected_role = None
     my_skills = ''
@@ -873,11 +1225,11 @@ def skill_gap():
     if request.method == 'POST':
         role_id        = request.form.get('role_id')
         user_skills_raw= request.form.get('user_skills', '')
-        role_doc       = db.market_skills.find_one({'_id': oid(role_id)})
+        role_doc       = market.get(role_id)
         if role_doc:
             selected_role = role_doc['job_role']
             required  = [sk.strip().lower() for sk in role_doc.get('required_skills', [])]
-            user_sk   = [sk.strip().lower() for sk in user_skills_raw.split(',') if sk.strip()]
+            user_sk   = {sk.strip().lower() for sk in user_skills_raw.split(',') if sk.strip()}
             matched   = [sk for sk in required if sk in user_sk]
             missing   = [sk for sk in required if sk not in user_sk]
             pct       = int(len(matched) / len(required) * 100) if required else 0
@@ -891,9 +1243,23 @@ def skill_gap():
 # ── CHATBOT ───────────────────────────────────────────────────
 @app.route('/chatbot')
 @login_required
+@cached_page(ttl=300)
 def chatbot():
     return render_template('chatbot/bot.html')
 
+def _faq_index():
+    """FAQ answers plus an inverted index: term -> [(faq position, weight), ...]."""
+    answers, postings = [], {}
+    for i, faq in enumerate(db.faqs.find({}, {'question':1,'answer':1,'keywords':1})):
+        for kw in (faq.get('keywords') or '').split(','):
+            if kw.strip():
+                postings.setdefault(kw.strip().lower(), []).append((i, 3))
+        for w in faq['question'].lower().split():
+            if len(w) > 3:
+                postings.setdefault(w, []).append((i, 1))
+        answers.append(faq['answer'])
+    return answers, tuple(postings.items())
+
 @app.route('/chatbot/ask', methods=['POST'])
 @login_required
 def chatbot_ask():
@@ -901,16 +1267,18 @@ def chatbot_ask():
     if not query:
         return jsonify({'reply': 'Please type a message.'})
 
+    # each distinct term is tested against the query once, however many FAQs share it
+    answers, postings = cached('faq_index', _faq_index, ttl=60)
+    scores = [0] * len(answers)
+    for term, hits in postings:
+        if term in query:
+            for i, weight in hits:
+                scores[i] += weight
     best_match, best_score = None, 0
-    for faq in db.faqs.find():
-        score = 0
-        for kw in (faq.get('keywords') or '').split(','):
-            if kw.strip() and kw.strip().lower() in query: score += 3
-        for word in faq['question'].lower().split():
-            if len(word) > 3 and word in query: score += 1
+    for answer, score in zip(answers, scores):
         if score > best_score:
             best_score = score
-            best_match = faq['answer']
+            best_match = answer
 
     if best_match and best_score > 0:
         reply = best_match
@@ -6,6 +6,7 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'placementpro_dev_secret')
     MONGO_URI   = os.getenv('MONGO_URI', 'mongodb://localhost:27017/placementpro')
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
 
     MAIL_SERVER         = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT           = int(os.getenv('MAIL_PORT', 587))